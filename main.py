@@ -151,8 +151,8 @@ def main():
         
         # Save JSON representation
         json_file = output_file.replace(".py", ".json")
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(workout.to_dict(), f, indent=2)
+        with open(json_file, "wb", buffering=1 << 20) as f:
+            f.write(json.dumps(workout.to_dict(), separators=(",", ":")).encode("utf-8"))
         print(f"✓ JSON saved to: {json_file}")
         
         # Ask if user wants to upload
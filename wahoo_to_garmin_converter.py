@@ -1,7 +1,20 @@
 """Convert Wahoo workout text files to Garmin workout objects using AWS Bedrock."""
 
+import ast
+import asyncio
+import functools
+import hashlib
+import inspect
+import io
+import os
+import tokenize
+import types
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from botocore.config import Config
 from garminconnect import Garmin
+from garminconnect import workout as _gc_workout_module
 from garminconnect.workout import (
     CyclingWorkout,
     HikingWorkout,
@@ -26,87 +39,231 @@ from workout_helpers import (
     create_warmup_step_distance_effort,
 )
 
+# Bedrock ignores cache points on prefixes shorter than this (Claude Sonnet)
+MIN_CACHEABLE_TOKENS = 1024
+
+# Output cap per generation. Kept at the previous 4096: no measurement of
+# generated workout sizes supports a lower bound, and truncation costs a retry.
+MAX_OUTPUT_TOKENS = 4096
+
+# Pooled keep-alive connections so retries reuse one TLS session to Bedrock
+_BEDROCK_CONFIG = Config(
+    max_pool_connections=16,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    tcp_keepalive=True,
+    read_timeout=120,
+)
+
+# Garmin API upload method for each workout class
+_UPLOADERS = {
+    SwimmingWorkout: "upload_swimming_workout",
+    RunningWorkout: "upload_running_workout",
+    CyclingWorkout: "upload_cycling_workout",
+    WalkingWorkout: "upload_walking_workout",
+    HikingWorkout: "upload_hiking_workout",
+}
+
+# Start of evaluate_workout's message for code that does not parse; its line
+# numbers refer to the code as generated, so retries must not minify it
+_SYNTAX_ERROR_PREFIX = "Syntax error in generated code"
+
+# Names available to generated workout code; read-only so it can be shared
+# across threads, and copied per evaluation since eval adds __builtins__
+_EVAL_GLOBALS = types.MappingProxyType({
+    'SwimmingWorkout': SwimmingWorkout,
+    'RunningWorkout': RunningWorkout,
+    'CyclingWorkout': CyclingWorkout,
+    'WalkingWorkout': WalkingWorkout,
+    'HikingWorkout': HikingWorkout,
+    'WorkoutSegment': WorkoutSegment,
+    'create_warmup_step': create_warmup_step,
+    'create_warmup_step_distance': create_warmup_step_distance,
+    'create_warmup_step_distance_effort': create_warmup_step_distance_effort,
+    'create_interval_step': create_interval_step,
+    'create_interval_step_distance': create_interval_step_distance,
+    'create_interval_step_distance_effort': create_interval_step_distance_effort,
+    'create_recovery_step': create_recovery_step,
+    'create_recovery_step_distance': create_recovery_step_distance,
+    'create_recovery_step_distance_effort': create_recovery_step_distance_effort,
+    'create_cooldown_step': create_cooldown_step,
+    'create_cooldown_step_distance': create_cooldown_step_distance,
+    'create_cooldown_step_distance_effort': create_cooldown_step_distance_effort,
+    'create_repeat_group': create_repeat_group,
+})
+
+# Temperatures for retries issued concurrently by aconvert_with_retry
+_SPECULATIVE_TEMPERATURES = (0.1, 0.3)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_system_prompt(system_prompt_path: str) -> str:
+    """Build the system prompt with the garminconnect workout module injected.
+    
+    Cached per path so repeated converter instances skip the disk read and
+    source lookup.
+    
+    Args:
+        system_prompt_path: Path to system prompt file
+        
+    Returns:
+        System prompt text
+    """
+    # Load workout.py module from installed package
+    workout_module = inspect.getsource(_gc_workout_module)
+    
+    # Load system prompt and replace placeholder with workout module
+    with open(system_prompt_path, encoding="utf-8") as f:
+        prompt_template = f.read()
+    
+    return prompt_template.replace("{pydantic_workout_module}", workout_module)
+
+
+# Python 3.12+ tokenizes f-strings (3.14+ also t-strings) as start/middle/end
+# tokens instead of a single STRING token
+_STRING_START_TOKENS = {
+    getattr(tokenize, name) for name in ("FSTRING_START", "TSTRING_START")
+    if hasattr(tokenize, name)
+}
+_STRING_END_TOKENS = {
+    getattr(tokenize, name) for name in ("FSTRING_END", "TSTRING_END")
+    if hasattr(tokenize, name)
+}
+
+
+def _minify(python_code: str) -> str:
+    """Strip comments and blank lines from generated code.
+    
+    Used to shrink previous code before it is resent on retry. Lines inside
+    multi-line strings (including f-strings) are left untouched, and code that
+    cannot be fully tokenized keeps everything past the point where
+    tokenizing stopped.
+    
+    Args:
+        python_code: Python code to minify
+        
+    Returns:
+        Code without comments or blank lines
+    """
+    lines = python_code.split("\n")
+    string_rows = set()
+    open_strings = []
+    last_row = 0
+    
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(python_code).readline):
+            if token.type == tokenize.COMMENT:
+                row, col = token.start
+                lines[row - 1] = lines[row - 1][:col].rstrip()
+            elif token.type == tokenize.STRING and token.start[0] != token.end[0]:
+                string_rows.update(range(token.start[0] + 1, token.end[0] + 1))
+            elif token.type in _STRING_START_TOKENS:
+                open_strings.append(token.start[0])
+            elif token.type in _STRING_END_TOKENS:
+                string_rows.update(range(open_strings.pop() + 1, token.end[0] + 1))
+            last_row = token.end[0]
+    except (tokenize.TokenError, SyntaxError):
+        # Keep the unprocessed rest, including any unterminated string
+        start_row = min(open_strings, default=last_row)
+        string_rows.update(range(start_row + 1, len(lines) + 1))
+    
+    return "\n".join(
+        line for row, line in enumerate(lines, start=1)
+        if row in string_rows or line.strip()
+    )
+
 
 class WahooToGarminConverter:
     """Converts Wahoo workout text files to Garmin workout Python code using AWS Bedrock."""
 
+    # Bedrock runtime clients shared across instances, keyed by region
+    _clients: dict = {}
+
     def __init__(
         self, 
         region_name: str = "us-east-1", 
         system_prompt_path: str = "system_prompt.txt",
+        cache_dir: str | None = "~/.cache/wahoo2garmin",
     ):
         """Initialize the converter with AWS Bedrock client.
         
         Args:
             region_name: AWS region for Bedrock service
             system_prompt_path: Path to system prompt file
+            cache_dir: Directory for cached validated conversions (None to disable)
         """
-        self.bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime", region_name=region_name
-        )
+        if region_name not in WahooToGarminConverter._clients:
+            WahooToGarminConverter._clients[region_name] = boto3.client(
+                service_name="bedrock-runtime",
+                region_name=region_name,
+                config=_BEDROCK_CONFIG,
+            )
+        self.bedrock_runtime = WahooToGarminConverter._clients[region_name]
+        self.region_name = region_name
         self.model_id = "us.anthropic.claude-sonnet-4-5-20250929-v1:0"
         
-        # Load workout.py module from installed package
-        import garminconnect.workout
-        import inspect
-        workout_module = inspect.getsource(garminconnect.workout)
+        self.system_prompt = _build_system_prompt(system_prompt_path)
         
-        # Load system prompt and replace placeholder with workout module
-        with open(system_prompt_path, encoding="utf-8") as f:
-            prompt_template = f.read()
+        # Cache the static system prompt across Converse calls (~4 chars per token)
+        self.system_prompt_tokens = len(self.system_prompt) // 4
+        self.system_blocks = [{"text": self.system_prompt}]
+        if self.system_prompt_tokens >= MIN_CACHEABLE_TOKENS:
+            self.system_blocks.append({"cachePoint": {"type": "default"}})
         
-        self.system_prompt = prompt_template.replace("{pydantic_workout_module}", workout_module)
+        # Token usage and stop reason reported by the most recent Converse call
+        self.last_usage = {}
+        self.last_stop_reason = None
+        
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
 
     def convert_workout(
-        self, wahoo_text: str, workout_type: str | None = "swimming", output_file: str = "generated_workout.py"
+        self, wahoo_text: str, workout_type: str | None = "swimming"
     ) -> str:
-        """Convert Wahoo workout text to Python code and save to file.
+        """Convert Wahoo workout text to Python code.
+        
+        The code is only returned; the output_file argument of earlier
+        versions is gone. convert_with_retry writes the file once the code
+        validates.
         
         Args:
             wahoo_text: The raw text from Wahoo workout file
             workout_type: Type of workout ('swimming', 'running', or 'cycling')
-            output_file: Path to save the generated Python code
             
         Returns:
             Generated Python code as string
         """
         # Use Bedrock Converse API to generate Python code
-        python_code = self._generate_workout_code(wahoo_text, workout_type)
-        
-        # Save to file
-        self._save_workout_code(python_code, output_file, workout_type)
-        
-        return python_code
+        return self._generate_workout_code(wahoo_text, workout_type)
 
     def retry_with_error(
         self,
         wahoo_text: str,
         workout_type: str | None,
-        output_file: str,
         error_message: str,
-        previous_code: str
+        previous_code: str,
+        *,
+        keep_code_intact: bool = False
     ) -> str:
         """Retry workout conversion with error feedback.
         
+        Like convert_workout, this no longer takes output_file and only
+        returns the code. keep_code_intact is keyword-only so an old fifth
+        positional output_file raises TypeError instead of setting it.
+        
         Args:
             wahoo_text: The raw text from Wahoo workout file
             workout_type: Type of workout
-            output_file: Path to save the generated Python code
             error_message: Error message from previous attempt
             previous_code: Previously generated code that failed
+            keep_code_intact: Send previous_code unminified, e.g. when the
+                error points at its line numbers
             
         Returns:
             Generated Python code as string
         """
         # Use Bedrock Converse API with error feedback
-        python_code = self._generate_workout_code_with_error(
-            wahoo_text, workout_type, error_message, previous_code
+        return self._generate_workout_code_with_error(
+            wahoo_text, workout_type, error_message, previous_code, keep_code_intact
         )
-        
-        # Save to file
-        self._save_workout_code(python_code, output_file, workout_type)
-        
-        return python_code
 
     def _generate_workout_code(self, wahoo_text: str, workout_type: str | None) -> str:
         """Use AWS Bedrock Converse API to generate Python workout code.
@@ -118,6 +275,50 @@ class WahooToGarminConverter:
         Returns:
             Generated Python code as string
         """
+        cached_code = self._load_cached_code(wahoo_text, workout_type)
+        if cached_code is not None:
+            self.last_usage = {}
+            self.last_stop_reason = None
+            return cached_code
+        
+        return self._stream_workout_code(self._user_content(wahoo_text, workout_type))
+
+    def _generate_workout_code_with_error(
+        self,
+        wahoo_text: str,
+        workout_type: str | None,
+        error_message: str,
+        previous_code: str,
+        keep_code_intact: bool = False,
+    ) -> str:
+        """Use AWS Bedrock Converse API to regenerate code with error feedback.
+        
+        Args:
+            wahoo_text: The raw text from Wahoo workout file
+            workout_type: Type of workout (or None to auto-detect)
+            error_message: Error from previous attempt
+            previous_code: Previously generated code that failed
+            keep_code_intact: Send previous_code unminified
+            
+        Returns:
+            Generated Python code as string
+        """
+        return self._stream_workout_code(
+            self._retry_user_content(
+                wahoo_text, workout_type, error_message, previous_code, keep_code_intact
+            )
+        )
+
+    def _user_content(self, wahoo_text: str, workout_type: str | None) -> list[dict]:
+        """Build the user message content for a first conversion attempt.
+        
+        Args:
+            wahoo_text: The raw text from Wahoo workout file
+            workout_type: Type of workout (or None to auto-detect)
+            
+        Returns:
+            Content blocks for the user message
+        """
         if workout_type:
             user_message = f"""Convert this {workout_type} workout to Python code:
 
@@ -131,56 +332,40 @@ Generate the Python code that creates a {workout_type.capitalize()}Workout objec
 
 Generate the Python code that creates the appropriate Workout object (SwimmingWorkout, RunningWorkout, or CyclingWorkout)."""
 
-        response = self.bedrock_runtime.converse(
-            modelId=self.model_id,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [{"text": user_message}],
-                },
-                {
-                    "role": "assistant",
-                    "content": [{"text": "```python"}],
-                },
-            ],
-            system=[{"text": self.system_prompt}],
-            inferenceConfig={
-                "maxTokens": 4096,
-                "temperature": 0.1,
-            },
-        )
+        # Cache point after the workout so retries, which repeat this exact
+        # message as their prefix, skip prefill for it
+        return [
+            {"text": user_message},
+            {"cachePoint": {"type": "default"}},
+        ]
 
-        # Extract the generated text (already prefilled with ```python)
-        output_message = response["output"]["message"]
-        content = output_message["content"][0]["text"]
-        
-        # Remove closing ``` if present
-        if content.endswith("```"):
-            content = content[:-3].rstrip()
-        
-        return content
-
-    def _generate_workout_code_with_error(
-        self, wahoo_text: str, workout_type: str | None, error_message: str, previous_code: str
-    ) -> str:
-        """Use AWS Bedrock Converse API to regenerate code with error feedback.
+    def _retry_user_content(
+        self,
+        wahoo_text: str,
+        workout_type: str | None,
+        error_message: str,
+        previous_code: str,
+        keep_code_intact: bool = False,
+    ) -> list[dict]:
+        """Build the user message content for a retry with error feedback.
         
         Args:
             wahoo_text: The raw text from Wahoo workout file
             workout_type: Type of workout (or None to auto-detect)
             error_message: Error from previous attempt
             previous_code: Previously generated code that failed
+            keep_code_intact: Send previous_code unminified
             
         Returns:
-            Generated Python code as string
+            Content blocks for the user message
         """
-        if workout_type:
-            workout_instruction = f"creates a {workout_type.capitalize()}Workout object"
-        else:
-            workout_instruction = "creates the appropriate Workout object (SwimmingWorkout, RunningWorkout, or CyclingWorkout)"
-            
-        user_message = f"""The previous workout conversion failed with this error:
-
+        if not keep_code_intact:
+            previous_code = _minify(previous_code)
+        
+        # Only append after the first-attempt content; any change ahead of
+        # its cache point would invalidate the cached prefix
+        retry_message = f"""---
+The previous attempt failed:
 ERROR: {error_message}
 
 PREVIOUS CODE:
@@ -188,39 +373,232 @@ PREVIOUS CODE:
 {previous_code}
 ```
 
-ORIGINAL WORKOUT:
-{wahoo_text}
+Please fix the error and regenerate the corrected Python code."""
 
-Please fix the error and generate corrected Python code that {workout_instruction}."""
+        return self._user_content(wahoo_text, workout_type) + [{"text": retry_message}]
 
-        response = self.bedrock_runtime.converse(
-            modelId=self.model_id,
-            messages=[
+    def _workout_request(self, user_content: list[dict], temperature: float = 0.1) -> dict:
+        """Build ConverseStream request arguments for a workout generation.
+        
+        The assistant turn is prefilled with ```python so the model replies
+        with code only.
+        
+        Args:
+            user_content: Content blocks for the user message
+            temperature: Sampling temperature
+            
+        Returns:
+            Keyword arguments for converse_stream
+        """
+        return {
+            "modelId": self.model_id,
+            "messages": [
                 {
                     "role": "user",
-                    "content": [{"text": user_message}],
+                    "content": user_content,
                 },
                 {
                     "role": "assistant",
                     "content": [{"text": "```python"}],
                 },
             ],
-            system=[{"text": self.system_prompt}],
-            inferenceConfig={
-                "maxTokens": 4096,
-                "temperature": 0.1,
+            "system": self.system_blocks,
+            # Stop server-side at the closing fence instead of generating it
+            "inferenceConfig": {
+                "maxTokens": MAX_OUTPUT_TOKENS,
+                "temperature": temperature,
+                "stopSequences": ["```"],
             },
+        }
+
+    @staticmethod
+    def _append_delta(content: io.StringIO, tail: str, text: str) -> str | None:
+        """Append a streamed text delta, truncating at the closing fence.
+        
+        Args:
+            content: Buffer collecting the generated code
+            tail: Last characters of the previous delta
+            text: Text of the current delta
+            
+        Returns:
+            Tail to carry into the next delta, or None once the fence is reached
+        """
+        content.write(text)
+        
+        # Look for the closing fence, which may straddle two deltas
+        window = tail + text
+        fence = window.find("```")
+        if fence != -1:
+            content.seek(content.tell() - (len(window) - fence))
+            content.truncate()
+            return None
+        return window[-2:]
+
+    def _stream_workout_code(self, user_content: list[dict]) -> str:
+        """Stream generated workout code from the AWS Bedrock ConverseStream API.
+        
+        Generation normally ends at the ``` stop sequence; if a closing fence
+        still arrives in the output, the stream is closed there. The reported
+        stop reason is kept in last_stop_reason (None if the stream was closed
+        early).
+        
+        Args:
+            user_content: Content blocks for the user message
+            
+        Returns:
+            Generated Python code as string
+        """
+        response = self.bedrock_runtime.converse_stream(**self._workout_request(user_content))
+
+        self.last_usage = {}
+        self.last_stop_reason = None
+        stream = response["stream"]
+        content = io.StringIO()
+        tail = ""
+        
+        for event in stream:
+            # Events carry a single key; look each one up once
+            block_delta = event.get("contentBlockDelta")
+            if block_delta is not None:
+                tail = self._append_delta(content, tail, block_delta["delta"].get("text", ""))
+                if tail is None:
+                    stream.close()
+                    break
+                continue
+            message_stop = event.get("messageStop")
+            if message_stop is not None:
+                self.last_stop_reason = message_stop.get("stopReason")
+                continue
+            metadata = event.get("metadata")
+            if metadata is not None:
+                self.last_usage = metadata.get("usage", {})
+        
+        # Strip once here so evaluation, retry feedback and the saved file all
+        # see the same lines (the stream starts with a newline after the fence)
+        return content.getvalue().strip()
+
+    async def _astream_workout_code(
+        self, client, user_content: list[dict], temperature: float = 0.1
+    ) -> tuple[str, str | None, dict]:
+        """Async variant of _stream_workout_code for an aioboto3 client.
+        
+        The stop reason and token usage are returned rather than stored on the
+        converter, since several of these calls can run at once.
+        
+        Args:
+            client: aioboto3 bedrock-runtime client
+            user_content: Content blocks for the user message
+            temperature: Sampling temperature
+            
+        Returns:
+            Tuple of (generated Python code, stop reason or None, token usage)
+        """
+        response = await client.converse_stream(
+            **self._workout_request(user_content, temperature)
+        )
+
+        usage = {}
+        stop_reason = None
+        stream = response["stream"]
+        content = io.StringIO()
+        tail = ""
+        
+        async for event in stream:
+            # Events carry a single key; look each one up once
+            block_delta = event.get("contentBlockDelta")
+            if block_delta is not None:
+                tail = self._append_delta(content, tail, block_delta["delta"].get("text", ""))
+                if tail is None:
+                    stream.close()
+                    break
+                continue
+            message_stop = event.get("messageStop")
+            if message_stop is not None:
+                stop_reason = message_stop.get("stopReason")
+                continue
+            metadata = event.get("metadata")
+            if metadata is not None:
+                usage = metadata.get("usage", {})
+        
+        # Strip once here so evaluation, retry feedback and the saved file all
+        # see the same lines (the stream starts with a newline after the fence)
+        return content.getvalue().strip(), stop_reason, usage
+
+    @staticmethod
+    def _print_cache_usage(usage: dict) -> None:
+        """Print prompt cache read/write token counts from a Bedrock usage block.
+        
+        Args:
+            usage: Usage dict from the stream's metadata event
+        """
+        print(
+            f"  - Cache read/write tokens: "
+            f"{usage.get('cacheReadInputTokens', 0)}/"
+            f"{usage.get('cacheWriteInputTokens', 0)}"
         )
 
-        # Extract the generated text
-        output_message = response["output"]["message"]
-        content = output_message["content"][0]["text"]
+    def _cache_path(self, wahoo_text: str, workout_type: str | None) -> str | None:
+        """Get the cache file path for a conversion.
         
-        # Remove closing ``` if present
-        if content.endswith("```"):
-            content = content[:-3].rstrip()
+        The key covers everything that determines the model output: the model,
+        the system prompt, the workout type and the workout text.
+        
+        Args:
+            wahoo_text: The raw text from Wahoo workout file
+            workout_type: Type of workout (or None to auto-detect)
+            
+        Returns:
+            Path to the cache file, or None if caching is disabled
+        """
+        if not self.cache_dir:
+            return None
+        
+        key = hashlib.sha256(
+            "\0".join(
+                (self.model_id, self.system_prompt, workout_type or "", wahoo_text)
+            ).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.py")
+
+    def _load_cached_code(self, wahoo_text: str, workout_type: str | None) -> str | None:
+        """Load previously validated code for an identical conversion.
+        
+        Args:
+            wahoo_text: The raw text from Wahoo workout file
+            workout_type: Type of workout (or None to auto-detect)
+            
+        Returns:
+            Cached Python code, or None on a cache miss
+        """
+        cache_path = self._cache_path(wahoo_text, workout_type)
+        if cache_path is None:
+            return None
+        
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _store_cached_code(self, wahoo_text: str, workout_type: str | None, python_code: str) -> None:
+        """Cache validated code for later identical conversions.
+        
+        Args:
+            wahoo_text: The raw text from Wahoo workout file
+            workout_type: Type of workout (or None to auto-detect)
+            python_code: Generated code that passed evaluation
+        """
+        cache_path = self._cache_path(wahoo_text, workout_type)
+        if cache_path is None:
+            return
         
-        return content
+        # The cache is an optimization only; never fail a conversion over it
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                f.write(python_code)
+        except OSError:
+            pass
 
     def _save_workout_code(self, python_code: str, output_file: str, workout_type: str) -> None:
         """Save generated Python code to file.
@@ -237,45 +615,62 @@ Please fix the error and generate corrected Python code that {workout_instructio
         with open(output_file, "w", encoding="utf-8") as f:
             f.write(python_code)
 
-    def evaluate_workout(self, workout_file: str) -> tuple[bool, str, object]:
-        """Evaluate a generated workout file.
+    def _check_workout(
+        self, workout_code: str, stop_reason: str | None, workout_file: str = "<generated>"
+    ) -> tuple[bool, str, object]:
+        """Evaluate generated workout code, reporting truncated output first.
+        
+        Code cut off at the output limit would otherwise surface as a
+        misleading syntax error.
         
         Args:
-            workout_file: Path to the generated workout Python file
+            workout_code: Generated workout Python code
+            stop_reason: Stop reason reported by Bedrock for the generation
+            workout_file: File name reported in syntax errors
             
         Returns:
             Tuple of (success, error_message, workout_object)
         """
-        try:
-            # Read the workout code
-            with open(workout_file, encoding="utf-8") as f:
-                workout_code = f.read()
-            
-            # Create namespace with all necessary classes and functions
-            namespace = {
-                'SwimmingWorkout': SwimmingWorkout,
-                'RunningWorkout': RunningWorkout,
-                'CyclingWorkout': CyclingWorkout,
-                'WalkingWorkout': WalkingWorkout,
-                'HikingWorkout': HikingWorkout,
-                'WorkoutSegment': WorkoutSegment,
-                'create_warmup_step': create_warmup_step,
-                'create_warmup_step_distance': create_warmup_step_distance,
-                'create_warmup_step_distance_effort': create_warmup_step_distance_effort,
-                'create_interval_step': create_interval_step,
-                'create_interval_step_distance': create_interval_step_distance,
-                'create_interval_step_distance_effort': create_interval_step_distance_effort,
-                'create_recovery_step': create_recovery_step,
-                'create_recovery_step_distance': create_recovery_step_distance,
-                'create_recovery_step_distance_effort': create_recovery_step_distance_effort,
-                'create_cooldown_step': create_cooldown_step,
-                'create_cooldown_step_distance': create_cooldown_step_distance,
-                'create_cooldown_step_distance_effort': create_cooldown_step_distance_effort,
-                'create_repeat_group': create_repeat_group,
-            }
+        if stop_reason == "max_tokens":
+            return (
+                False,
+                f"Output truncated: generation hit the {MAX_OUTPUT_TOKENS}-token limit before "
+                "the workout was complete. Generate shorter code (e.g. use create_repeat_group "
+                "for repeated sets and omit comments).",
+                None,
+            )
+        return self.evaluate_workout(workout_code, workout_file)
+
+    def evaluate_workout(
+        self, workout_code: str, workout_file: str = "<generated>"
+    ) -> tuple[bool, str, object]:
+        """Evaluate generated workout code.
+        
+        Takes the code itself rather than the path of a file holding it, as
+        earlier versions did. Read the file first when evaluating saved code.
+        
+        Args:
+            workout_code: Generated workout Python code
+            workout_file: File name reported in syntax errors
             
+        Returns:
+            Tuple of (success, error_message, workout_object)
+            
+        Raises:
+            ValueError: If workout_code is the path of an existing file
+        """
+        # Old callers passed a path here; fail loudly rather than report a
+        # NameError for the path evaluated as code
+        if "\n" not in workout_code and os.path.isfile(workout_code):
+            raise ValueError(
+                f"evaluate_workout takes workout code, not a file path: {workout_code!r}"
+            )
+        
+        try:
             # Execute the code to create the workout object
-            workout = eval(workout_code, namespace)
+            tree = ast.parse(workout_code, filename=workout_file, mode="eval")
+            code = compile(tree, workout_file, "eval")
+            workout = eval(code, dict(_EVAL_GLOBALS))
             
             # Validate it's the right type
             if not isinstance(workout, (SwimmingWorkout, RunningWorkout, CyclingWorkout, WalkingWorkout, HikingWorkout)):
@@ -294,7 +689,11 @@ Please fix the error and generate corrected Python code that {workout_instructio
             return True, "", workout
             
         except SyntaxError as e:
-            return False, f"Syntax error in generated code: {e}", None
+            return (
+                False,
+                f"{_SYNTAX_ERROR_PREFIX} at line {e.lineno}, column {e.offset}: {e.msg}",
+                None,
+            )
         except NameError as e:
             return False, f"Name error (missing import or undefined name): {e}", None
         except TypeError as e:
@@ -334,7 +733,7 @@ Please fix the error and generate corrected Python code that {workout_instructio
                 if verbose:
                     workout_type_msg = f"{workout_type} " if workout_type else "(auto-detecting type) "
                     print(f"Generating {workout_type_msg}workout code...")
-                python_code = self.convert_workout(wahoo_text, workout_type, output_file)
+                python_code = self.convert_workout(wahoo_text, workout_type)
             else:
                 # Retry with error feedback
                 if verbose:
@@ -342,20 +741,27 @@ Please fix the error and generate corrected Python code that {workout_instructio
                 python_code = self.retry_with_error(
                     wahoo_text, 
                     workout_type, 
-                    output_file,
                     error_message,
-                    previous_code
+                    previous_code,
+                    keep_code_intact=error_message.startswith(_SYNTAX_ERROR_PREFIX),
                 )
             
             if verbose:
                 print(f"✓ Code generated ({len(python_code)} characters)")
+            if verbose and self.last_usage:
+                self._print_cache_usage(self.last_usage)
             
             # Evaluate the generated code
             if verbose:
                 print("Evaluating generated workout...")
-            success, error_message, workout = self.evaluate_workout(output_file)
+            success, error_message, workout = self._check_workout(
+                python_code, self.last_stop_reason, output_file
+            )
             
             if success:
+                # Only the validated code is written out
+                self._save_workout_code(python_code, output_file, workout_type)
+                self._store_cached_code(wahoo_text, workout_type, python_code)
                 if verbose:
                     print("✓ Workout validated successfully!")
                     print(f"  - Name: {workout.workoutName}")
@@ -377,6 +783,163 @@ Please fix the error and generate corrected Python code that {workout_instructio
         
         return False, f"Failed after {max_retries} attempts. Last error: {error_message}", None
 
+    async def aconvert_with_retry(
+        self,
+        wahoo_text: str,
+        workout_type: str | None = None,
+        output_file: str = "generated_workout.py",
+        max_retries: int = 3,
+        verbose: bool = True,
+        client=None,
+    ) -> tuple[bool, str, object]:
+        """Async variant of convert_with_retry.
+        
+        Bedrock calls go through aioboto3 so a conversion in progress does not
+        block other coroutines on the event loop. After a failed first attempt,
+        retries are issued concurrently in pairs at different temperatures and
+        the first one that validates wins; the rest are cancelled. Requires the
+        optional aioboto3 dependency.
+        
+        When serving many conversions, open one aioboto3 bedrock-runtime client
+        and pass it in on every call made from the same event loop, so its
+        connection pool is reused. Without one, a temporary client is opened
+        and closed for this call alone.
+        
+        Args:
+            wahoo_text: Wahoo workout text
+            workout_type: Type of workout (optional, will auto-detect if None)
+            output_file: Output file path
+            max_retries: Maximum number of retry attempts
+            verbose: Whether to print progress messages
+            client: Optional caller-owned aioboto3 bedrock-runtime client,
+                used as-is and left open
+            
+        Returns:
+            Tuple of (success, message, workout_object)
+        """
+        if client is not None:
+            return await self._aconvert_with_client(
+                client, wahoo_text, workout_type, output_file, max_retries, verbose
+            )
+        
+        import aioboto3
+        
+        session = aioboto3.Session()
+        async with session.client(
+            "bedrock-runtime", region_name=self.region_name, config=_BEDROCK_CONFIG
+        ) as temporary_client:
+            return await self._aconvert_with_client(
+                temporary_client, wahoo_text, workout_type, output_file, max_retries, verbose
+            )
+
+    async def _aconvert_with_client(
+        self,
+        client,
+        wahoo_text: str,
+        workout_type: str | None,
+        output_file: str,
+        max_retries: int,
+        verbose: bool,
+    ) -> tuple[bool, str, object]:
+        """Run aconvert_with_retry against an open aioboto3 client.
+        
+        Args:
+            client: aioboto3 bedrock-runtime client
+            wahoo_text: Wahoo workout text
+            workout_type: Type of workout (optional, will auto-detect if None)
+            output_file: Output file path
+            max_retries: Maximum number of retry attempts
+            verbose: Whether to print progress messages
+            
+        Returns:
+            Tuple of (success, message, workout_object)
+        """
+        if verbose:
+            print(f"Attempt 1/{max_retries}")
+        
+        # First attempt - normal conversion
+        python_code = self._load_cached_code(wahoo_text, workout_type)
+        stop_reason = None
+        usage = {}
+        if python_code is None:
+            python_code, stop_reason, usage = await self._astream_workout_code(
+                client, self._user_content(wahoo_text, workout_type)
+            )
+        if verbose and usage:
+            self._print_cache_usage(usage)
+        
+        # Evaluate the generated code
+        success, error_message, workout = self._check_workout(
+            python_code, stop_reason, output_file
+        )
+        attempt = 1
+        
+        # Retry feedback pairs the last returned code with its own error
+        code_error = error_message
+        
+        while not success and attempt < max_retries:
+            if verbose:
+                print(f"✗ Validation failed: {error_message}")
+            
+            # Retry with error feedback, several temperatures at once
+            retry_content = self._retry_user_content(
+                wahoo_text,
+                workout_type,
+                code_error,
+                python_code,
+                keep_code_intact=code_error.startswith(_SYNTAX_ERROR_PREFIX),
+            )
+            temperatures = _SPECULATIVE_TEMPERATURES[:max_retries - attempt]
+            if verbose:
+                print(f"Attempts {attempt + 1}-{attempt + len(temperatures)}/{max_retries} (concurrent)")
+            attempt += len(temperatures)
+            
+            tasks = [
+                asyncio.create_task(
+                    self._astream_workout_code(client, retry_content, temperature)
+                )
+                for temperature in temperatures
+            ]
+            failures = []
+            try:
+                for next_code in asyncio.as_completed(tasks):
+                    # A failed request (e.g. throttling) only loses that attempt
+                    try:
+                        candidate, stop_reason, usage = await next_code
+                    except Exception as e:
+                        failures.append(e)
+                        error_message = f"Bedrock request failed: {type(e).__name__}: {e}"
+                        continue
+                    
+                    if verbose and usage:
+                        self._print_cache_usage(usage)
+                    python_code = candidate
+                    success, error_message, workout = self._check_workout(
+                        python_code, stop_reason, output_file
+                    )
+                    code_error = error_message
+                    if success:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                # Let cancelled streams unwind before the client closes
+                await asyncio.gather(*tasks, return_exceptions=True)
+            
+            if len(failures) == len(tasks):
+                raise failures[-1]
+        
+        if success:
+            self._save_workout_code(python_code, output_file, workout_type)
+            self._store_cached_code(wahoo_text, workout_type, python_code)
+            if verbose:
+                print("✓ Workout validated successfully!")
+            return True, "Workout converted and validated successfully!", workout
+        
+        if verbose:
+            print(f"✗ Validation failed: {error_message}")
+        return False, f"Failed after {max_retries} attempts. Last error: {error_message}", None
+
     def upload_workout(self, workout: object, garmin_api: Garmin) -> dict:
         """Upload a workout object to Garmin Connect.
         
@@ -391,15 +954,43 @@ Please fix the error and generate corrected Python code that {workout_instructio
             ValueError: If workout type is not supported
         """
         # Upload based on workout type
-        if isinstance(workout, SwimmingWorkout):
-            return garmin_api.upload_swimming_workout(workout)
-        elif isinstance(workout, RunningWorkout):
-            return garmin_api.upload_running_workout(workout)
-        elif isinstance(workout, CyclingWorkout):
-            return garmin_api.upload_cycling_workout(workout)
-        elif isinstance(workout, WalkingWorkout):
-            return garmin_api.upload_walking_workout(workout)
-        elif isinstance(workout, HikingWorkout):
-            return garmin_api.upload_hiking_workout(workout)
-        else:
+        method = _UPLOADERS.get(type(workout))
+        if method is None:
             raise ValueError(f"Unsupported workout type: {type(workout).__name__}")
+        return getattr(garmin_api, method)(workout)
+
+    def upload_workouts(
+        self, workouts: list[object], garmin_api: Garmin, max_workers: int = 1
+    ) -> list[dict]:
+        """Upload several workout objects to Garmin Connect in one session.
+        
+        All uploads go through the same authenticated Garmin API instance, so
+        its pooled HTTPS session is reused instead of reconnecting per workout.
+        Workouts are dispatched grouped by type.
+        
+        Args:
+            workouts: Workout objects to upload
+            garmin_api: Authenticated Garmin API instance
+            max_workers: Number of concurrent uploads (1 uploads sequentially)
+            
+        Returns:
+            Responses from Garmin Connect API, in the same order as workouts
+            
+        Raises:
+            ValueError: If any workout type is not supported
+        """
+        order = sorted(range(len(workouts)), key=lambda i: type(workouts[i]).__name__)
+        results = [None] * len(workouts)
+        
+        def upload(index: int) -> None:
+            results[index] = self.upload_workout(workouts[index], garmin_api)
+        
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # Consume the iterator so upload errors are raised here
+                list(executor.map(upload, order))
+        else:
+            for index in order:
+                upload(index)
+        
+        return results
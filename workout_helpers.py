@@ -7,50 +7,126 @@ not conditionTypeId 1 (which is for lap button). This is different from the
 garminconnect library's ConditionType.DISTANCE constant.
 """
 
+import sys
 from typing import Any
 from garminconnect.workout import ExecutableStep, StepType, TargetType
 
+# Shared step payload pieces. ExecutableStep copies its declared dict fields
+# (stepType, endCondition, targetType) on validation, so one instance of each
+# can back every step. Extra fields such as secondaryTargetType are stored
+# as-is and must be copied per step. Identifier-like literals are interned by
+# the compiler; dotted values are interned explicitly.
+_WARMUP_STEP_TYPE = {
+    "stepTypeId": StepType.WARMUP,
+    "stepTypeKey": "warmup",
+    "displayOrder": 1,
+}
+_INTERVAL_STEP_TYPE = {
+    "stepTypeId": StepType.INTERVAL,
+    "stepTypeKey": "interval",
+    "displayOrder": 3,
+}
+_RECOVERY_STEP_TYPE = {
+    "stepTypeId": StepType.RECOVERY,
+    "stepTypeKey": "recovery",
+    "displayOrder": 4,
+}
+_COOLDOWN_STEP_TYPE = {
+    "stepTypeId": StepType.COOLDOWN,
+    "stepTypeKey": "cooldown",
+    "displayOrder": 2,
+}
+_DISTANCE_END_CONDITION = {
+    "conditionTypeId": 3,  # Swimming distance uses 3, not 1
+    "conditionTypeKey": "distance",
+    "displayOrder": 3,
+    "displayable": True,
+}
+_NO_TARGET = {
+    "workoutTargetTypeId": TargetType.NO_TARGET,
+    "workoutTargetTypeKey": sys.intern("no.target"),
+    "displayOrder": 1,
+}
+_SWIM_INSTRUCTION_TARGET = {
+    "workoutTargetTypeId": 18,
+    "workoutTargetTypeKey": sys.intern("swim.instruction"),
+    "displayOrder": 18,
+}
 
-def create_warmup_step_distance(
+_STEP_KINDS = {
+    "warmup": _WARMUP_STEP_TYPE,
+    "interval": _INTERVAL_STEP_TYPE,
+    "recovery": _RECOVERY_STEP_TYPE,
+    "cooldown": _COOLDOWN_STEP_TYPE,
+}
+
+
+def _make_step(
+    kind: str,
     distance: float,
-    step_order: int = 1,
+    step_order: int,
     target_type: dict[str, Any] | None = None,
     description: str | None = None,
+    effort_level: int | None = None,
 ) -> ExecutableStep:
-    """Create a warmup step with distance-based duration.
+    """Create a distance-based step of the given kind.
     
-    Note: Uses conditionTypeId 3 for swimming distance (not 1).
+    Backs all of the public create_*_step_distance helpers.
     
     Args:
+        kind: Step kind ('warmup', 'interval', 'recovery' or 'cooldown')
         distance: Distance in yards for swimming
         step_order: Step order number
-        target_type: Optional target type configuration
+        target_type: Optional target type configuration (ignored with effort_level)
         description: Optional step description/notes
+        effort_level: Optional effort level 1-5 for an effort-based target
     """
+    # ExecutableStep is a pydantic model, so it only takes keywords. Full
+    # construction is kept over model_copy() of a template step: validation is
+    # what copies the shared dicts, and a template would alias them per step.
+    if effort_level is not None:
+        return ExecutableStep(
+            stepOrder=step_order,
+            stepType=_STEP_KINDS[kind],
+            endCondition=_DISTANCE_END_CONDITION,
+            endConditionValue=distance,
+            targetType=_NO_TARGET,
+            description=description,
+            # Extra field: stored as passed, so each step needs its own copy
+            secondaryTargetType=dict(_SWIM_INSTRUCTION_TARGET),
+            secondaryTargetValueOne=float(effort_level),
+            secondaryTargetValueTwo=0.0,
+        )
+    
     return ExecutableStep(
         stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.WARMUP,
-            "stepTypeKey": "warmup",
-            "displayOrder": 1,
-        },
-        endCondition={
-            "conditionTypeId": 3,  # Swimming distance uses 3, not 1
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
+        stepType=_STEP_KINDS[kind],
+        endCondition=_DISTANCE_END_CONDITION,
         endConditionValue=distance,
-        targetType=target_type
-        or {
-            "workoutTargetTypeId": TargetType.NO_TARGET,
-            "workoutTargetTypeKey": "no.target",
-            "displayOrder": 1,
-        },
+        targetType=target_type if target_type is not None else _NO_TARGET,
         description=description,
     )
 
 
+def create_warmup_step_distance(
+    distance: float,
+    step_order: int = 1,
+    target_type: dict[str, Any] | None = None,
+    description: str | None = None,
+) -> ExecutableStep:
+    """Create a warmup step with distance-based duration.
+    
+    Note: Uses conditionTypeId 3 for swimming distance (not 1).
+    
+    Args:
+        distance: Distance in yards for swimming
+        step_order: Step order number
+        target_type: Optional target type configuration
+        description: Optional step description/notes
+    """
+    return _make_step("warmup", distance, step_order, target_type, description)
+
+
 def create_interval_step_distance(
     distance: float,
     step_order: int,
@@ -67,28 +143,7 @@ def create_interval_step_distance(
         target_type: Optional target type configuration
         description: Optional step description/notes
     """
-    return ExecutableStep(
-        stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.INTERVAL,
-            "stepTypeKey": "interval",
-            "displayOrder": 3,
-        },
-        endCondition={
-            "conditionTypeId": 3,  # Swimming distance uses 3, not 1
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
-        endConditionValue=distance,
-        targetType=target_type
-        or {
-            "workoutTargetTypeId": TargetType.NO_TARGET,
-            "workoutTargetTypeKey": "no.target",
-            "displayOrder": 1,
-        },
-        description=description,
-    )
+    return _make_step("interval", distance, step_order, target_type, description)
 
 
 def create_recovery_step_distance(
@@ -107,28 +162,7 @@ def create_recovery_step_distance(
         target_type: Optional target type configuration
         description: Optional step description/notes
     """
-    return ExecutableStep(
-        stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.RECOVERY,
-            "stepTypeKey": "recovery",
-            "displayOrder": 4,
-        },
-        endCondition={
-            "conditionTypeId": 3,  # Swimming distance uses 3, not 1
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
-        endConditionValue=distance,
-        targetType=target_type
-        or {
-            "workoutTargetTypeId": TargetType.NO_TARGET,
-            "workoutTargetTypeKey": "no.target",
-            "displayOrder": 1,
-        },
-        description=description,
-    )
+    return _make_step("recovery", distance, step_order, target_type, description)
 
 
 def create_cooldown_step_distance(
@@ -147,34 +181,17 @@ def create_cooldown_step_distance(
         target_type: Optional target type configuration
         description: Optional step description/notes
     """
-    return ExecutableStep(
-        stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.COOLDOWN,
-            "stepTypeKey": "cooldown",
-            "displayOrder": 2,
-        },
-        endCondition={
-            "conditionTypeId": 3,  # Swimming distance uses 3, not 1
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
-        endConditionValue=distance,
-        targetType=target_type
-        or {
-            "workoutTargetTypeId": TargetType.NO_TARGET,
-            "workoutTargetTypeKey": "no.target",
-            "displayOrder": 1,
-        },
-        description=description,
-    )
+    return _make_step("cooldown", distance, step_order, target_type, description)
 
 
 # Effort-based target helpers for swimming workouts
 def create_effort_target(effort_level: int) -> dict[str, Any]:
     """Create an effort-based target for swimming workouts.
     
+    Returns fresh dicts on every call, so callers may modify the result. The
+    step helpers pass these fields directly rather than going through this
+    function.
+    
     Args:
         effort_level: Effort level from 1-5 (1=easy, 5=max effort)
         
@@ -182,16 +199,8 @@ def create_effort_target(effort_level: int) -> dict[str, Any]:
         Dictionary with target configuration including secondaryTargetType
     """
     return {
-        "targetType": {
-            "workoutTargetTypeId": TargetType.NO_TARGET,
-            "workoutTargetTypeKey": "no.target",
-            "displayOrder": 1,
-        },
-        "secondaryTargetType": {
-            "workoutTargetTypeId": 18,
-            "workoutTargetTypeKey": "swim.instruction",
-            "displayOrder": 18,
-        },
+        "targetType": dict(_NO_TARGET),
+        "secondaryTargetType": dict(_SWIM_INSTRUCTION_TARGET),
         "secondaryTargetValueOne": float(effort_level),
         "secondaryTargetValueTwo": 0.0,
     }
@@ -211,25 +220,7 @@ def create_warmup_step_distance_effort(
         effort_level: Effort level 1-5 (1=easy, 5=max)
         description: Optional step description/notes
     """
-    effort_config = create_effort_target(effort_level)
-    
-    return ExecutableStep(
-        stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.WARMUP,
-            "stepTypeKey": "warmup",
-            "displayOrder": 1,
-        },
-        endCondition={
-            "conditionTypeId": 3,
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
-        endConditionValue=distance,
-        description=description,
-        **effort_config
-    )
+    return _make_step("warmup", distance, step_order, description=description, effort_level=effort_level)
 
 
 def create_interval_step_distance_effort(
@@ -246,25 +237,7 @@ def create_interval_step_distance_effort(
         effort_level: Effort level 1-5 (1=easy, 5=max)
         description: Optional step description/notes
     """
-    effort_config = create_effort_target(effort_level)
-    
-    return ExecutableStep(
-        stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.INTERVAL,
-            "stepTypeKey": "interval",
-            "displayOrder": 3,
-        },
-        endCondition={
-            "conditionTypeId": 3,
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
-        endConditionValue=distance,
-        description=description,
-        **effort_config
-    )
+    return _make_step("interval", distance, step_order, description=description, effort_level=effort_level)
 
 
 def create_recovery_step_distance_effort(
@@ -281,25 +254,7 @@ def create_recovery_step_distance_effort(
         effort_level: Effort level 1-5 (1=easy, 5=max)
         description: Optional step description/notes
     """
-    effort_config = create_effort_target(effort_level)
-    
-    return ExecutableStep(
-        stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.RECOVERY,
-            "stepTypeKey": "recovery",
-            "displayOrder": 4,
-        },
-        endCondition={
-            "conditionTypeId": 3,
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
-        endConditionValue=distance,
-        description=description,
-        **effort_config
-    )
+    return _make_step("recovery", distance, step_order, description=description, effort_level=effort_level)
 
 
 def create_cooldown_step_distance_effort(
@@ -316,22 +271,4 @@ def create_cooldown_step_distance_effort(
         effort_level: Effort level 1-5 (1=easy, 5=max)
         description: Optional step description/notes
     """
-    effort_config = create_effort_target(effort_level)
-    
-    return ExecutableStep(
-        stepOrder=step_order,
-        stepType={
-            "stepTypeId": StepType.COOLDOWN,
-            "stepTypeKey": "cooldown",
-            "displayOrder": 2,
-        },
-        endCondition={
-            "conditionTypeId": 3,
-            "conditionTypeKey": "distance",
-            "displayOrder": 3,
-            "displayable": True,
-        },
-        endConditionValue=distance,
-        description=description,
-        **effort_config
-    )
+    return _make_step("cooldown", distance, step_order, description=description, effort_level=effort_level)